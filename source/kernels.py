@@ -1,11 +1,26 @@
 import torch
 
 
+def squared_distance(x1, x2):
+    """
+    Pairwise squared Euclidean distances ‖x1ᵢ - x2ⱼ‖² via the identity
+    ‖x1ᵢ‖² + ‖x2ⱼ‖² - 2 x1ᵢ·x2ⱼ, i.e. a single GEMM instead of an N × M × D intermediate.
+
+    Args:
+        x1, x2 (torch.Tensor): N/M × D tensors where N/M is the number of descriptor vectors
+                               and D is the dimensionality
+    """
+    sq = torch.addmm(x1.pow(2).sum(dim=1, keepdim=True), x1, x2.T, alpha=-2)  # [N, M]
+    sq = sq + x2.pow(2).sum(dim=1)
+    return sq.clamp(min=0)  # remove negative round-off
+
+
 class Kernel(torch.nn.Module):
     def __init__(self, device='cpu'):
         super().__init__()
         self.device = device
         self.kernel_hyperparameters = None
+        self.isotropic = False  # whether the kernel only depends on squared distances
 
     def get_duplicate_ids(self, x1, x2, tol=1e-8):
         """
@@ -22,15 +37,25 @@ class Kernel(torch.nn.Module):
             x_larger, x_smaller = x1, x2
         else:
             x_larger, x_smaller = x2, x1
-        triu_ids = torch.triu_indices(x_smaller.shape[0], x_larger.shape[0],
-                                      offset=int(torch.equal(x1, x2)),
-                                      device=self.device)
-        K = self(x_smaller, x_larger)
-        duplicate_triu_ids = torch.nonzero((1 - K[triu_ids[0], triu_ids[1]]) < tol, as_tuple=True)[0]
+        offset = int(torch.equal(x1, x2))
+        # only the upper triangle of K(x_smaller, x_larger) is compared, so evaluate it in
+        # row blocks that skip the columns left of each block's diagonal
+        n_rows = x_smaller.shape[0]
+        block_size = max(1, -(-n_rows // 8))
+        row_ids = [torch.empty(0, dtype=torch.long, device=self.device)]
+        col_ids = [torch.empty(0, dtype=torch.long, device=self.device)]
+        for start in range(0, n_rows, block_size):
+            stop = min(start + block_size, n_rows)
+            K = self(x_smaller[start:stop], x_larger[start + offset:])
+            i, j = torch.nonzero((1 - K) < tol, as_tuple=True)
+            i, j = i + start, j + start + offset
+            triu = j >= i + offset
+            row_ids.append(i[triu])
+            col_ids.append(j[triu])
         if x1.shape[0] > x2.shape[0]:
-            duplicate_ids = triu_ids[0][duplicate_triu_ids]
+            duplicate_ids = torch.cat(row_ids)
         else:
-            duplicate_ids = triu_ids[1][duplicate_triu_ids]
+            duplicate_ids = torch.cat(col_ids)
         return duplicate_ids
 
     def remove_duplicates(self, x1, x2, tol=1e-8):
@@ -39,11 +64,9 @@ class Kernel(torch.nn.Module):
         within some tolerance.
         """
         ids_to_remove = self.get_duplicate_ids(x1, x2, tol)
-        mask = torch.ones(x2.shape[0], dtype=torch.bool, device=x1.device)
+        mask = torch.ones(x2.shape[0], dtype=torch.bool, device=x2.device)
         mask[ids_to_remove] = False
-        all_ids = torch.arange(x2.shape[0], device=x1.device)
-        ids_to_keep = all_ids[mask]
-        return x2[ids_to_keep, :]
+        return x2[mask]
 
 
 class SquaredExponentialKernel(Kernel):
@@ -54,6 +77,7 @@ class SquaredExponentialKernel(Kernel):
         super().__init__(device=device)
         self.lengthscale = torch.tensor([lengthscale], dtype=torch.float64, device=self.device)
         self.kernel_hyperparameters = [self.lengthscale]
+        self.isotropic = True
 
     def forward(self, x1, x2, diag=False):
         """
@@ -66,9 +90,15 @@ class SquaredExponentialKernel(Kernel):
         assert x1.shape[1] == x2.shape[1], 'vector dimensions of x1 and x2 are incompatible'
 
         if not diag:
-            aux_x1 = x1.unsqueeze(1)  # shape [N, 1, D] to broadcast with x2 with shape [M, D]
+            scalar_form = squared_distance(x1, x2)  # [N, M]
         else:
             assert x1.shape[0] == x2.shape[0], 'diag = True requires same dims'
-            aux_x1 = x1
-        scalar_form = torch.sum((aux_x1 - x2).pow(2), dim=-1)  # [N, M]
-        return torch.exp(-0.5 * scalar_form / self.lengthscale.pow(2))
+            scalar_form = torch.sum((x1 - x2).pow(2), dim=-1)  # [N]
+        return self.from_squared_distance(scalar_form)
+
+    def from_squared_distance(self, scalar_form):
+        """
+        Evaluate the kernel from precomputed squared distances (see squared_distance).
+        """
+        # fold -1/(2l²) into a single coefficient so the [N, M] buffer sees one multiply and an in-place exp
+        return (scalar_form * (-0.5 / self.lengthscale.pow(2))).exp_()
@@ -6,7 +6,8 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lbfgs'))
 from lbfgsnew import LBFGSNew
 
-from utils import jitter, cholesky_update
+from utils import jitter, cholesky_update, cholesky_append
+from kernels import squared_distance
 
 
 class SparseGaussianProcess(torch.nn.Module):
@@ -34,28 +35,34 @@ class SparseGaussianProcess(torch.nn.Module):
                  decomp_mode='v', sgp_mode='dtc',
                  init_noise=1e-2, init_outputscale=1.0,
                  noise_range=[1e-4, 2], outputscale_range=[0.1, 10],
-                 device='cpu'):
+                 device='cpu', linalg_device='cpu'):
         """
         Args:
-            descriptor_dim (int)    : dimensionality of descriptor vector
-            kernel (torch.nn.module): SGP kernel object to compute covariance
-            decomp_mode (str)       : c, v, qr
-            sgp_mode (str)          : sor, dtc, fitc, vfe
-            init_noise (float)      : noise for initialization
-            init_outputscale (float): outputscale for initialization
-            noise_range (list)      : noise hyperparameter range
-            outputscale_range (list): outputscale hyperparameter range
-            device (torch.device)   : device (default is cpu)
+            descriptor_dim (int)        : dimensionality of descriptor vector
+            kernel (torch.nn.module)    : SGP kernel object to compute covariance
+            decomp_mode (str)           : c, v, qr
+            sgp_mode (str)              : sor, dtc, fitc, vfe
+            init_noise (float)          : noise for initialization
+            init_outputscale (float)    : outputscale for initialization
+            noise_range (list)          : noise hyperparameter range
+            outputscale_range (list)    : outputscale hyperparameter range
+            device (torch.device)       : device (default is cpu)
+            linalg_device (torch.device): device for small Cholesky factorizations (default is cpu)
         """
         super().__init__()
 
         self.device = device
         self.kernel = kernel
+        # small factorizations are faster on the CPU than on accelerators due to launch overheads
+        self.linalg_device = torch.device(linalg_device)
+        self.linalg_threshold = 512
 
         # SGP dataset and sparse inducing points
-        self.full_descriptors = torch.empty((0, descriptor_dim), dtype=torch.float64, device=self.device)
+        # (full set and training outputs are stored in buffers with amortized growth, see properties)
+        self._full_descriptors = torch.empty((0, descriptor_dim), dtype=torch.float64, device=self.device)
+        self._training_outputs = torch.empty((0,), dtype=torch.float64, device=self.device)
+        self._full_size = 0
         self.sparse_descriptors = torch.empty((0, descriptor_dim), dtype=torch.float64, device=self.device)
-        self.training_outputs = torch.empty((0,), dtype=torch.float64, device=self.device)
 
         # basic SGP hyperparameters (noise and outputscale)
         assert ((noise_range[0] > 1e-16) & (noise_range[1] > 1e-16)
@@ -87,8 +94,13 @@ class SparseGaussianProcess(torch.nn.Module):
         self.Lambda_inv = None
         self.Lss = None
         self.L_Sigma = None
+        self.Ksf_Lambda_inv_y = None
         self.alpha = None
         self._nlml = None
+        # accumulated torch.linalg.cholesky_ex info, checked lazily to avoid host synchronization
+        self._cholesky_info = torch.zeros((), dtype=torch.int32, device=self.device)
+        # buffers that Ksf and Λ⁻¹ are views into, grown along the full set dimension
+        self._column_buffers = {}
 
     def update_model(self, x_train, y_train, x_sparse=None):
         """
@@ -111,8 +123,7 @@ class SparseGaussianProcess(torch.nn.Module):
 
         if init:
             assert x_sparse is not None, 'model is empty, x_sparse required for initialization'
-            self.full_descriptors = torch.cat((self.full_descriptors, x_train), dim=0)
-            self.training_outputs = torch.cat((self.training_outputs, y_train))
+            self.__append_full_set(x_train, y_train)
             self.sparse_descriptors = torch.cat((self.sparse_descriptors, x_sparse), dim=0)
             # compute and keep covariances matrices without outputscale premultiplied
             self.Ksf = self.kernel(self.sparse_descriptors, self.full_descriptors)
@@ -120,21 +131,27 @@ class SparseGaussianProcess(torch.nn.Module):
             self.__update_intermediates()
         else:
             if self.sgp_mode == 'fitc':  # efficient update doesn't work for FITC
+                # extend covariances matrices (without outputscale premultiplied) block-wise,
+                # only evaluating the kernel for the new rows/columns
                 updated_train, updated_sparse = False, False
                 if x_train is not None:
                     if x_train.shape[0] != 0:
-                        self.full_descriptors = torch.cat((self.full_descriptors, x_train), dim=0)
-                        self.training_outputs = torch.cat((self.training_outputs, y_train))
+                        Ksfprime = self.kernel(self.sparse_descriptors, x_train)
+                        self.__append_columns('Ksf', Ksfprime)
+                        self.__append_full_set(x_train, y_train)
                         updated_train = True
                 if x_sparse is not None:
                     if x_sparse.shape[0] != 0:
+                        Kssprime = self.kernel(self.sparse_descriptors, x_sparse)
+                        Ksprimesprime = self.kernel(x_sparse, x_sparse)
+                        Kss_upper = torch.cat([self.Kss, Kssprime], dim=1)
+                        Kss_lower = torch.cat([Kssprime.T, Ksprimesprime], dim=1)
+                        self.Kss = torch.cat([Kss_upper, Kss_lower], dim=0)
+                        Kspf = self.kernel(x_sparse, self.full_descriptors)
+                        self.Ksf = torch.cat([self.Ksf, Kspf], dim=0)
                         self.sparse_descriptors = torch.cat((self.sparse_descriptors, x_sparse), dim=0)
                         updated_sparse = True
-                # compute and keep covariances matrices without outputscale premultiplied
                 if updated_train or updated_sparse:
-                    self.Ksf = self.kernel(self.sparse_descriptors, self.full_descriptors)
-                    if updated_sparse:
-                        self.Kss = self.kernel(self.sparse_descriptors, self.sparse_descriptors)
                     self.__update_intermediates()
             else:
                 if x_train is not None:
@@ -143,64 +160,117 @@ class SparseGaussianProcess(torch.nn.Module):
                 if x_sparse is not None:
                     if x_sparse.shape[0] != 0:
                         self.__update_sparse_set(x_sparse)
+        self.__check_cholesky()
 
-    def __update_intermediates(self):
+    def __append_full_set(self, x_train, y_train):
+        """
+        Internal function that appends N' data points to the full set buffers. The buffer
+        capacity grows geometrically, so appends are amortized O(N') rather than O(N).
+        """
+        size, new_size = self._full_size, self._full_size + x_train.shape[0]
+        if new_size > self._training_outputs.shape[0]:
+            capacity = max(2 * self._training_outputs.shape[0], new_size)
+            full_descriptors = self._full_descriptors.new_empty((capacity, self._full_descriptors.shape[1]))
+            full_descriptors[:size] = self.full_descriptors
+            self._full_descriptors = full_descriptors
+            training_outputs = self._training_outputs.new_empty((capacity,))
+            training_outputs[:size] = self.training_outputs
+            self._training_outputs = training_outputs
+        self._full_descriptors[size:new_size] = x_train
+        self._training_outputs[size:new_size] = y_train
+        self._full_size = new_size
+
+    def __append_columns(self, name, columns):
+        """
+        Internal function that appends N' full set columns to self.Ksf or self.Lambda_inv. These
+        are kept as views into buffers whose capacity grows geometrically, so appends are amortized
+        O(MN') rather than O(MN). The buffer is reallocated if the attribute has been reassigned
+        since the last append (e.g. by a sparse set update or hyperparameter optimization).
+        """
+        x = getattr(self, name)
+        buffer = self._column_buffers.get(name)
+        size, new_size = x.shape[-1], x.shape[-1] + columns.shape[-1]
+        if (buffer is None or buffer.data_ptr() != x.data_ptr() or buffer.stride() != x.stride()
+                or buffer.shape[:-1] != x.shape[:-1] or new_size > buffer.shape[-1]):
+            buffer = x.new_empty(x.shape[:-1] + (max(2 * size, new_size),))
+            buffer[..., :size] = x
+            self._column_buffers[name] = buffer
+        buffer[..., size:new_size] = columns
+        setattr(self, name, buffer[..., :new_size])
+
+    def __update_intermediates(self, Lss_unscaled=None):
         """
         This function is called to update the intermediate quantities
-        Lss, L_Sigma and alpha. This function is only called during
+        Lss, L_Sigma, Ksf Λ⁻¹ y and alpha. This function is only called during
         initialization and for hyperparameter tuning.
+
+        Args:
+            Lss_unscaled (torch.Tensor): Cholesky factor of Kss without outputscale premultiplied,
+                                         reused instead of refactorizing Kss if provided
         """
         # multiply outputscale to covariance matrices
         outputscale = self.__constrained_hyperparameter('outputscale')
         Ksf = outputscale * self.Ksf
         Kss = outputscale * self.Kss
         # Cholesky decompose Kss with jitter
-        self.Lss = torch.linalg.cholesky(jitter(Kss))  # O(M³)
+        if Lss_unscaled is None:
+            self.Lss = self.__cholesky(jitter(Kss))  # O(M³)
+        else:
+            self.Lss = outputscale.sqrt() * Lss_unscaled  # O(M²)
         # get Λ⁻¹
         self.Lambda_inv = self.__get_Lambda_inv(self.full_descriptors)
 
         match self.decomp_mode:
             case 'c':  # direct Cholesky factorization (least reliable but cheap)
-                Sigma = Kss + (Ksf * self.Lambda_inv) @ Ksf.T  # O(M²N)
-                self.L_Sigma = torch.linalg.cholesky(jitter(Sigma))  # O(M³)
+                Sigma = Kss + self.__Lambda_inv_product(Ksf, Ksf)  # O(M²N)
+                self.L_Sigma = self.__cholesky(jitter(Sigma))  # O(M³)
             case 'v':  # V method (reasonably reliable and moderately expensive)
                 V = torch.linalg.solve_triangular(self.Lss, Ksf, upper=False)  # O(M²N)
-                V_aux = V * self.Lambda_inv.sqrt()  # O(MN) since Λ⁻¹ is diagonal
-                Gamma = jitter(V_aux @ V_aux.T, eps=1)  # O(M²N)
-                L_Gamma = torch.linalg.cholesky(Gamma)  # O(M³)
+                Gamma = self.__Lambda_inv_product(V, V)  # O(M²N)
+                Gamma.diagonal().add_(1)  # Γ = I + V Λ⁻¹ Vᵀ without materializing I
+                L_Gamma = self.__cholesky(Gamma)  # O(M³)
                 self.L_Sigma = self.Lss @ L_Gamma  # O(M³)
             case 'qr':  # QR method (most reliable and expensive)
-                B = torch.cat([(Ksf * self.Lambda_inv.sqrt()).T, self.Lss.T], dim=0)  # dim (N + M) by M
-                _, R = torch.linalg.qr(B)  # O(M²N + M³)
-                self.L_Sigma = R.T
+                A = (Ksf * self.Lambda_inv.sqrt()).T  # dim N by M
+                self.L_Sigma = self.__stacked_qr(A).T  # O(M²N + M³)
 
         # compute α by doing matrix-vector multiplications first
-        self.alpha = torch.mv(Ksf, self.Lambda_inv * self.training_outputs)  # O(MN)
-        self.alpha = torch.cholesky_solve(self.alpha.unsqueeze(-1), self.L_Sigma, upper=False)[:, 0]  # O(M²)
+        self.Ksf_Lambda_inv_y = torch.mv(Ksf, self.Lambda_inv * self.training_outputs)  # O(MN)
+        self.alpha = torch.cholesky_solve(self.Ksf_Lambda_inv_y.unsqueeze(-1), self.L_Sigma, upper=False)[:, 0]  # O(M²)
+
+    def __stacked_qr(self, A):
+        """
+        Internal function that returns the triangular factor R of the QR decomposition of
+        B = [A; Lssᵀ]. A is reduced to its own triangular factor first, so the (N + M) × M
+        matrix B is never formed and the second factorization only sees a 2M × M stack. Q is
+        only formed if backpropagation requires it.
+        """
+        mode = 'reduced' if (A.requires_grad or self.Lss.requires_grad) else 'r'
+        _, R = torch.linalg.qr(A, mode=mode)  # O(M²N)
+        _, R = torch.linalg.qr(torch.cat([R, self.Lss.T], dim=0), mode=mode)  # O(M³)
+        return R
 
     def __update_full_set(self, x_train, y_train):
         """
         Update model with N' new full set data points (input and output).
         """
-        self.full_descriptors = torch.cat((self.full_descriptors, torch.atleast_2d(x_train)), dim=0)
-        self.training_outputs = torch.cat((self.training_outputs, y_train))
+        self.__append_full_set(torch.atleast_2d(x_train), y_train)
 
         # update covariance matrices
         outputscale = self.__constrained_hyperparameter('outputscale')
         Ksfprime = self.kernel(self.sparse_descriptors, x_train)
-        self.Ksf = torch.cat([self.Ksf, Ksfprime], dim=1)
+        self.__append_columns('Ksf', Ksfprime)
         Ksfprime = outputscale * Ksfprime
-        Ksf = outputscale * self.Ksf
 
         # Update Σ (U_Σ)
         Lambda_inv_prime = self.__get_Lambda_inv(x_train, update=True)
         aux = Ksfprime * Lambda_inv_prime.sqrt()
         self.L_Sigma = cholesky_update(self.L_Sigma, aux)  # use efficient Cholesky update
-        self.Lambda_inv = torch.cat([self.Lambda_inv, Lambda_inv_prime])
+        self.__append_columns('Lambda_inv', Lambda_inv_prime)
 
-        # compute α by doing matrix-vector multiplications first
-        self.alpha = torch.mv(Ksf, self.Lambda_inv * self.training_outputs)  # O(MN)
-        self.alpha = torch.cholesky_solve(self.alpha.unsqueeze(-1), self.L_Sigma, upper=False)[:, 0]  # O(M²)
+        # compute α with Ksf Λ⁻¹ y only accumulating the contribution of the new columns
+        self.Ksf_Lambda_inv_y = self.Ksf_Lambda_inv_y + torch.mv(Ksfprime, Lambda_inv_prime * y_train)  # O(MN')
+        self.alpha = torch.cholesky_solve(self.Ksf_Lambda_inv_y.unsqueeze(-1), self.L_Sigma, upper=False)[:, 0]  # O(M²)
 
     def __update_sparse_set(self, x_sparse):
         """
@@ -216,7 +286,7 @@ class SparseGaussianProcess(torch.nn.Module):
         self.Kss = torch.cat([Kss_upper, Kss_lower], dim=0)
         # Ksf
         Kfsprime = self.kernel(self.full_descriptors, x_sparse)  # without outputscale
-        Ksf_prev = outputscale * self.Ksf  # required later
+        Ksf_prev = self.Ksf  # required later (without outputscale)
         self.Ksf = torch.cat([self.Ksf, Kfsprime.T], dim=0)  # without outputscale
 
         self.sparse_descriptors = torch.cat((self.sparse_descriptors, x_sparse), dim=0)
@@ -227,17 +297,11 @@ class SparseGaussianProcess(torch.nn.Module):
         Kfsprime = outputscale * Kfsprime
 
         # update Lss with block trick
-        Lss_inv_Kssp = torch.linalg.solve_triangular(self.Lss, Kssprime, upper=False)  # O(M²M')
-        Lsp = torch.linalg.cholesky(jitter(Ksprimesprime - Lss_inv_Kssp.T @ Lss_inv_Kssp))  # O(M'³)
-        zero_block = torch.zeros(Kssprime.shape, dtype=Kssprime.dtype, device=self.device)
-        newLss_upper = torch.cat([self.Lss, zero_block], dim=1)
-        newLss_lower = torch.cat([Lss_inv_Kssp.T, Lsp], dim=1)
-        self.Lss = torch.cat([newLss_upper, newLss_lower], dim=0)
+        self.Lss = cholesky_append(self.Lss, Kssprime, Ksprimesprime, cholesky=self.__cholesky)
 
         # Update Σ (U_Σ) with block trick
-        B = Kssprime + (Ksf_prev * self.Lambda_inv) @ Kfsprime  # O(NMM')
-        Kspf_Lamda_inv_root = Kfsprime.T * self.Lambda_inv.sqrt()  # O(NM') since Λ⁻¹ is diagonal
-        C = Ksprimesprime + Kspf_Lamda_inv_root @ Kspf_Lamda_inv_root.T  # O(N²M')
+        B = Kssprime + outputscale * self.__Lambda_inv_product(Ksf_prev, Kfsprime.T)  # O(NMM')
+        C = Ksprimesprime + self.__Lambda_inv_product(Kfsprime.T, Kfsprime.T)  # O(NM'²)
         aux = torch.linalg.solve_triangular(self.L_Sigma, B, upper=False)  # O(M²M')
         schur = C - aux.T @ aux  # O(MM'²)
         # get nearest psd schur (https://doi.org/10.1016/0024-3795(88)90223-6)
@@ -245,15 +309,17 @@ class SparseGaussianProcess(torch.nn.Module):
         L, Q = torch.linalg.eigh(schur)
         schur_root = Q * torch.clamp(L, min=0).sqrt()
         schur = schur_root @ schur_root.T
-        L_Psi = torch.linalg.cholesky(jitter(schur))
+        L_Psi = self.__cholesky(jitter(schur))
         # assemble new L_Sigma
         zero_block = torch.zeros((self.L_Sigma.shape[0], L_Psi.shape[1]), dtype=L_Psi.dtype, device=self.device)
         L_upper = torch.cat([self.L_Sigma, zero_block], dim=1)
         L_lower = torch.cat([aux.T, L_Psi], dim=1)
         self.L_Sigma = torch.cat([L_upper, L_lower], dim=0)
 
-        self.alpha = torch.mv(outputscale * self.Ksf, self.Lambda_inv * self.training_outputs)  # O(MN)
-        self.alpha = torch.cholesky_solve(self.alpha.unsqueeze(-1), self.L_Sigma, upper=False)[:, 0]  # O(M²)
+        # compute α with Ksf Λ⁻¹ y only extended by the rows of the new sparse points
+        Kspf_Lambda_inv_y = torch.mv(Kfsprime.T, self.Lambda_inv * self.training_outputs)  # O(M'N)
+        self.Ksf_Lambda_inv_y = torch.cat([self.Ksf_Lambda_inv_y, Kspf_Lambda_inv_y])
+        self.alpha = torch.cholesky_solve(self.Ksf_Lambda_inv_y.unsqueeze(-1), self.L_Sigma, upper=False)[:, 0]  # O(M²)
 
     def forward(self, x_test, mean_var=[True, True], include_noise=False):
         """
@@ -309,7 +375,10 @@ class SparseGaussianProcess(torch.nn.Module):
         fit = 0.5 * torch.dot(self.training_outputs, self.Lambda_inv * aux)
         penalty = torch.sum(torch.log(torch.abs(self.L_Sigma.diag())))
         penalty = penalty - torch.sum(torch.log(torch.abs(self.Lss.diag())))
-        penalty = penalty - 0.5 * torch.sum(torch.log(torch.abs(self.Lambda_inv)))
+        if self.sgp_mode == 'fitc':
+            penalty = penalty - 0.5 * torch.sum(torch.log(torch.abs(self.Lambda_inv)))
+        else:  # Λ⁻¹ = σ⁻² I, so its log-determinant is known without an O(N) reduction (zero if N = 0)
+            penalty = penalty - 0.5 * self.full_descriptors.shape[0] * torch.log(self.Lambda_inv[:1]).sum()
         size = self.full_descriptors.shape[0] * 0.5 * np.log(2 * np.pi)
         if self.sgp_mode == 'vfe':
             noise = self.__constrained_hyperparameter('noise')
@@ -327,7 +396,8 @@ class SparseGaussianProcess(torch.nn.Module):
         self.__compute_negative_log_marginal_likelihood()
         return -1 * self._nlml.item()
 
-    def optimize_hyperparameters(self, rtol=1e-2, relax_inducing_points=False, relax_kernel_params=False):
+    def optimize_hyperparameters(self, rtol=1e-2, relax_inducing_points=False, relax_kernel_params=False,
+                                 compile_updates=False):
         """
         Optimize SGP (and kernel) hyperparameters. This function will always optimize
         the noise and kernel outputscale by default. It can additionally optimize the
@@ -337,6 +407,9 @@ class SparseGaussianProcess(torch.nn.Module):
             rtol (float)                : relative tolerance for terminating optimization
             relax_inducing_points (bool): whether to relax the inducing points or not
             relax_kernel_params (bool)  : whether to relax kernel hyperparameters
+            compile_updates (bool)      : whether to torch.compile the intermediate updates (compiling
+                                          takes seconds, so whether it pays off depends on the model
+                                          size and the length of the optimization)
         """
         # assemble hyperparameters to be optimized
         params = [self._noise, self._outputscale]
@@ -346,14 +419,32 @@ class SparseGaussianProcess(torch.nn.Module):
             params.append(self.sparse_descriptors)
         # initialize LBFGS optimizer
         self.optimizer = LBFGSNew(params, lr=2e-3, history_size=8, max_iter=5)
+        # only the kernel hyperparameters change with fixed inducing points, so isotropic
+        # kernels can be re-evaluated from cached squared distances at every iteration
+        cache_distances = (relax_kernel_params and not relax_inducing_points
+                           and getattr(self.kernel, 'isotropic', False))
+        if cache_distances:
+            Dsf = squared_distance(self.sparse_descriptors, self.full_descriptors)
+            Dss = squared_distance(self.sparse_descriptors, self.sparse_descriptors)
+        # Kss is otherwise fixed up to the outputscale, so its Cholesky factor only needs rescaling
+        Lss_unscaled = None
+        if not (relax_inducing_points or relax_kernel_params):
+            Lss_unscaled = self.__cholesky(jitter(self.Kss))
+        # shapes are fixed during the optimization, so the update is compiled once and reused
+        update_intermediates = self.__update_intermediates
+        if compile_updates:
+            update_intermediates = torch.compile(update_intermediates, dynamic=False)
 
         def closure():
             if torch.is_grad_enabled():
                 self.optimizer.zero_grad()
-            if relax_inducing_points or relax_kernel_params:
+            if cache_distances:
+                self.Ksf = self.kernel.from_squared_distance(Dsf)
+                self.Kss = self.kernel.from_squared_distance(Dss)
+            elif relax_inducing_points or relax_kernel_params:
                 self.Ksf = self.kernel(self.sparse_descriptors, self.full_descriptors)
                 self.Kss = self.kernel(self.sparse_descriptors, self.sparse_descriptors)
-            self.__update_intermediates()
+            update_intermediates(Lss_unscaled)
             self.__compute_negative_log_marginal_likelihood()
             if self._nlml.requires_grad:
                 self._nlml.backward()
@@ -363,6 +454,7 @@ class SparseGaussianProcess(torch.nn.Module):
             param.requires_grad_()
         counter = 0
         closure()
+        self.__check_cholesky()
         with open('hypopt.dat', 'w') as f:
             f.write('{:^15} {:^15} {:^15}\n'
                     .format('NLML', 'Outputscale', 'Noise'))
@@ -374,6 +466,7 @@ class SparseGaussianProcess(torch.nn.Module):
         while np.abs(d_nlml / prev_nlml) > rtol:
             counter += 1
             self.optimizer.step(closure)
+            self.__check_cholesky()  # .item() below synchronizes anyway
             this_nlml = self._nlml.item()
             d_nlml = np.abs(this_nlml - prev_nlml)
             with open('hypopt.dat', 'a') as f:
@@ -388,6 +481,7 @@ class SparseGaussianProcess(torch.nn.Module):
         self.Lambda_inv = self.Lambda_inv.detach()
         self.Lss = self.Lss.detach()
         self.L_Sigma = self.L_Sigma.detach()
+        self.Ksf_Lambda_inv_y = self.Ksf_Lambda_inv_y.detach()
         self.alpha = self.alpha.detach()
         self._nlml = self._nlml.detach()
         if relax_inducing_points or relax_kernel_params:
@@ -395,6 +489,46 @@ class SparseGaussianProcess(torch.nn.Module):
             self.Kss = self.Kss.detach()
         return counter
 
+    def __cholesky(self, A):
+        """
+        Internal function that returns the lower Cholesky factor of A. Unlike torch.linalg.cholesky,
+        torch.linalg.cholesky_ex does not synchronize with the host to check for failures, so its
+        info is accumulated and only checked in __check_cholesky. Matrices smaller than
+        self.linalg_threshold are factorized on self.linalg_device.
+        Note: if the model lives on an accelerator and self.linalg_device is the CPU, every such
+              factorization copies A to the host, which synchronizes just like torch.linalg.cholesky
+              does. This trades the synchronization for the lower launch overhead of CPU solvers on
+              small matrices; set self.linalg_threshold = 0 to keep all factorizations on device.
+        """
+        if A.shape[0] < self.linalg_threshold and A.device != self.linalg_device:
+            L, info = torch.linalg.cholesky_ex(A.to(self.linalg_device))
+            L, info = L.to(A.device), info.to(A.device)
+        else:
+            L, info = torch.linalg.cholesky_ex(A)
+        self._cholesky_info = torch.maximum(self._cholesky_info, info)
+        return L
+
+    def __check_cholesky(self):
+        """
+        Internal function that raises if any Cholesky factorization since the last check failed.
+        """
+        order = self._cholesky_info.item()
+        self._cholesky_info.zero_()
+        if order > 0:
+            raise torch.linalg.LinAlgError('Cholesky factorization failed, the leading minor of order {} '
+                                           'is not positive-definite'.format(order))
+
+    def __Lambda_inv_product(self, A, B):
+        """
+        Internal function that returns A Λ⁻¹ Bᵀ. Λ⁻¹ = σ⁻² I for all modes but FITC, so the
+        scalar is applied to the product rather than to the columns of A.
+        """
+        if self.sgp_mode == 'fitc':
+            return (A * self.Lambda_inv) @ B.T  # O(MN) since Λ⁻¹ is diagonal
+        # σ⁻² from the stored Λ⁻¹ (which the rest of the intermediates were built with),
+        # zero for an empty full set where A Bᵀ vanishes anyway
+        return self.Lambda_inv[:1].sum() * (A @ B.T)
+
     def __get_Lambda_inv(self, full_set, update=False):
         """
         Internal function that returns the diagonal matrix Λ⁻¹.
@@ -434,6 +568,14 @@ class SparseGaussianProcess(torch.nn.Module):
         # used for initializing hyperparameters
         return - torch.log(((param_range[1] - param_range[0]) / (hparam - param_range[0])) - 1)
 
+    @property
+    def full_descriptors(self):
+        return self._full_descriptors[:self._full_size]
+
+    @property
+    def training_outputs(self):
+        return self._training_outputs[:self._full_size]
+
     @property
     def noise(self):
         return self.__constrained_hyperparameter('noise').item()
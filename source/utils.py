@@ -25,6 +25,20 @@ def cholesky_update(L, V):
     return L
 
 
+def cholesky_append(L, B, C, cholesky=torch.linalg.cholesky):
+    """
+    Block Cholesky extension to compute L' where L' @ L'.T = [[A, B], [B.T, C]] given
+    L @ L.T = A, so that only the new rows of the factor are computed (O(M²M' + M'³)).
+    The lower Cholesky factor of the new diagonal block is computed with the callable cholesky.
+    """
+    L21 = torch.linalg.solve_triangular(L, B, upper=False)  # O(M²M')
+    L22 = cholesky(jitter(C - L21.T @ L21))  # O(M'³)
+    zero_block = torch.zeros(B.shape, dtype=B.dtype, device=B.device)
+    L_upper = torch.cat([L, zero_block], dim=1)
+    L_lower = torch.cat([L21.T, L22], dim=1)
+    return torch.cat([L_upper, L_lower], dim=0)
+
+
 def howI(A):
     return torch.max(torch.abs(A - torch.eye(A.shape[0], dtype=A.dtype))).item()
 
@@ -25,6 +25,17 @@ class TestDuplicateHandling(unittest.TestCase):
 
         print('SGP initialization works as expected')
 
+    def test_empty_full_set(self):
+        kernel = SquaredExponentialKernel()
+        x_sparse = torch.atleast_2d(torch.linspace(-1, 1, 5, dtype=torch.float64)).T
+        for mode in ['sor', 'dtc', 'fitc', 'vfe']:
+            for decomp in ['c', 'v', 'qr']:
+                SGP = SparseGaussianProcess(1, kernel, decomp_mode=decomp, sgp_mode=mode)
+                SGP.update_model(x_sparse[:0], torch.empty(0, dtype=torch.float64), x_sparse)
+                assert SGP.log_marginal_likelihood == 0
+
+        print('SGP initialization with an empty full set works as expected')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,7 +4,7 @@ import unittest
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../source'))
-from kernels import SquaredExponentialKernel
+from kernels import SquaredExponentialKernel, squared_distance
 
 
 class TestKernelFunctions(unittest.TestCase):
@@ -41,6 +41,24 @@ class TestKernelFunctions(unittest.TestCase):
         self.assertTrue(torch.equal(x3_clean, torch.atleast_2d(torch.tensor([1, 2, 3, 4, 5], dtype=torch.float64)).T))
         print('Kernel duplicate handling works as expected')
 
+    def test_squared_distance_form(self):
+        x1 = torch.rand((20, 3), dtype=torch.float64)
+        x2 = torch.rand((30, 3), dtype=torch.float64)
+        kernel = SquaredExponentialKernel(lengthscale=0.7)
+        kernel.lengthscale.requires_grad_()
+
+        K = kernel(x1, x2)
+        K_ref = torch.exp(-0.5 * (x1.unsqueeze(1) - x2).pow(2).sum(dim=-1) / kernel.lengthscale.pow(2))
+        assert torch.max(torch.abs(K - K_ref)) < 1e-14
+        grad = torch.autograd.grad(K.sum(), kernel.lengthscale)[0]
+
+        # cached squared distances give the same covariance and lengthscale gradient
+        K_cached = kernel.from_squared_distance(squared_distance(x1, x2))
+        assert torch.equal(K, K_cached)
+        grad_cached = torch.autograd.grad(K_cached.sum(), kernel.lengthscale)[0]
+        assert torch.equal(grad, grad_cached)
+        print('Kernel evaluation from squared distances works as expected')
+
 
 if __name__ == '__main__':
     unittest.main()
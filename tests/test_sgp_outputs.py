@@ -3,6 +3,7 @@ import unittest
 
 import os
 import sys
+import tempfile
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../source'))
 from sgp import SparseGaussianProcess
 from kernels import SquaredExponentialKernel
@@ -12,6 +13,19 @@ def func(x):
     return torch.cos(0.5 * x) - 0.3 * x + 0.1 * torch.exp(0.3 * x) + 0.5 * torch.rand(x.shape, dtype=torch.float64)
 
 
+class PlainKernel(torch.nn.Module):
+    """
+    Kernel that is only a torch.nn.Module (no isotropic flag), wrapping the squared exponential kernel.
+    """
+    def __init__(self):
+        super().__init__()
+        self.base_kernel = SquaredExponentialKernel()
+        self.kernel_hyperparameters = self.base_kernel.kernel_hyperparameters
+
+    def forward(self, x1, x2, diag=False):
+        return self.base_kernel(x1, x2, diag=diag)
+
+
 class TestSGPOutputs(unittest.TestCase):
 
     def setUp(self):
@@ -24,6 +38,17 @@ class TestSGPOutputs(unittest.TestCase):
         # ^ very important to prune inducing points close together for matrices to be
         #   well conditioned and reduce error during triangular solves
         self.x_test = torch.atleast_2d(L * (2 * torch.rand(1000, dtype=torch.float64) - 1)).T
+        # small model for the hyperparameter optimization tests
+        self.x_train_small, self.y_train_small = self.x_train[:50], self.y_train[:50]
+        self.x_sparse_small = self.kernel.remove_duplicates(self.x_train_small, self.x_train_small, tol=1)
+        # optimize_hyperparameters writes hypopt.dat to the working directory
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
 
     def test_updates(self):
         Ns = self.x_sparse.shape[1]
@@ -60,6 +85,36 @@ class TestSGPOutputs(unittest.TestCase):
 
         print('Efficient updates work as expected')
 
+    def test_cached_distances(self):
+        # cached squared distances (isotropic kernel) and fresh kernel evaluations (plain module)
+        # should give the same kernel hyperparameter optimization
+        SGPs = []
+        for kernel in [SquaredExponentialKernel(), PlainKernel()]:
+            SGP = SparseGaussianProcess(1, kernel, sgp_mode='vfe', init_noise=0.1)
+            SGP.update_model(self.x_train_small, self.y_train_small, self.x_sparse_small)
+            SGP.optimize_hyperparameters(relax_kernel_params=True)
+            SGPs.append(SGP)
+
+        assert torch.max(torch.abs(SGPs[0].Ksf - SGPs[1].Ksf)) < 1e-12
+        assert torch.max(torch.abs(SGPs[0].Kss - SGPs[1].Kss)) < 1e-12
+        assert abs(SGPs[0].kernel.lengthscale.item() - SGPs[1].kernel.base_kernel.lengthscale.item()) < 1e-12
+        assert abs(SGPs[0].log_marginal_likelihood - SGPs[1].log_marginal_likelihood) < 1e-8
+        print('Cached squared distances work as expected')
+
+    def test_compile_updates(self):
+        # compiled and eager intermediate updates should converge to the same hyperparameters
+        SGPs = []
+        for compile_updates in [False, True]:
+            SGP = SparseGaussianProcess(1, SquaredExponentialKernel(), sgp_mode='vfe', init_noise=0.1)
+            SGP.update_model(self.x_train_small, self.y_train_small, self.x_sparse_small)
+            SGP.optimize_hyperparameters(relax_kernel_params=True, compile_updates=compile_updates)
+            SGPs.append(SGP)
+
+        for param1, param2 in zip(SGPs[0].parameters(), SGPs[1].parameters()):
+            assert torch.allclose(param1, param2, rtol=1e-6, atol=1e-8)
+        assert abs(SGPs[0].log_marginal_likelihood - SGPs[1].log_marginal_likelihood) < 1e-6
+        print('Compiled updates work as expected')
+
 
 if __name__ == '__main__':
     unittest.main()
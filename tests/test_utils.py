@@ -4,7 +4,7 @@ import unittest
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../source'))
-from utils import cholesky_update
+from utils import cholesky_update, cholesky_append
 
 
 class TestUtils(unittest.TestCase):
@@ -25,6 +25,20 @@ class TestUtils(unittest.TestCase):
         test_rankN(1000, 200)
         print('Cholesky updates work as expected')
 
+    def test_chol_append(self):
+
+        def test_blockN(N, M):
+            A = torch.rand((N + M, N + M), dtype=torch.float64)
+            A = A.T @ A + 1e-5 * torch.eye(A.shape[0], dtype=A.dtype)  # make positive definite
+            L = torch.linalg.cholesky(A[:N, :N])
+            L = cholesky_append(L, A[:N, N:], A[N:, N:])
+            assert torch.max(torch.abs((A - L @ L.T))) <= 1e-6  # jitter added to Schur complement
+
+        test_blockN(10, 2)
+        test_blockN(100, 20)
+        test_blockN(1000, 200)
+        print('Cholesky appends work as expected')
+
 
 if __name__ == '__main__':
     unittest.main()